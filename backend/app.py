@@ -1,19 +1,27 @@
 import asyncio
-import json
+import hashlib
 import logging
 import os
+import socket
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel
-
-from fastapi import Depends, FastAPI, HTTPException, Request, status
+from functools import lru_cache
+from typing import Dict, Optional, List, Set
+import orjson
+from pydantic import BaseModel, ConfigDict
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette.sse import EventSourceResponse
 from supabase import Client
 from dotenv import load_dotenv
 from common import get_supabase, get_redis
-from common import WARNING_QUEUE
-from openai import OpenAI
+from common import WARNING_QUEUE, ANALYSIS_CHANNEL, SUMMARY_CACHE_PREFIX
+from common import SUMMARY_VERSION_KEY
+from common import invalidate_summary_cache
+from openai import AsyncOpenAI
 
 load_dotenv()
 
@@ -21,15 +29,40 @@ load_dotenv()
 _openai_client = None
 
 
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> AsyncOpenAI:
     global _openai_client
     if _openai_client is None:
-        _openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        _openai_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
     return _openai_client
 
 
+def log_task_exit(task: asyncio.Task) -> None:
+    """
+    Done callback logging a background task that died instead of being cancelled.
+
+    Args:
+        task: Finished lifespan task
+    """
+    if not task.cancelled() and task.exception():
+        logging.error(f"{task.get_name()} stopped", exc_info=task.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the analysis worker and the SSE fanout for as long as the app is up.
+    """
+    worker = asyncio.create_task(analysis_worker(), name="analysis_worker")
+    fanout = asyncio.create_task(analysis_fanout(), name="analysis_fanout")
+    worker.add_done_callback(log_task_exit)
+    fanout.add_done_callback(log_task_exit)
+    yield
+    worker.cancel()
+    fanout.cancel()
+
+
 # fastapi setup
-app = FastAPI(title="GitHub Events Monitor", version="1.0.0")
+app = FastAPI(title="GitHub Events Monitor", version="1.0.0", lifespan=lifespan)
 origins = [os.environ.get("FRONTEND_ORIGINS")]
 if origins == [None]:
     origins = ["*"]
@@ -42,31 +75,89 @@ app.add_middleware(
 )
 
 
+# seconds a /summary response is cached for, in redis and by clients
+SUMMARY_CACHE_TTL = 5
+# reads the current cache version and that version's body in one round trip
+SUMMARY_CACHE_LOOKUP = """
+local version = redis.call("GET", KEYS[1]) or "0"
+return {version, redis.call("GET", ARGV[1] .. version .. ":" .. ARGV[2])}
+"""
+
+
+@lru_cache(maxsize=1024)
+def timestamp_to_iso(timestamp: int) -> str:
+    """Convert a unix timestamp to an ISO string, memoized across polling clients."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
 # endpoints
 @app.get("/summary", response_model=dict)
 async def list_summaries(
-    since: Optional[int] = None, supabase: Client = Depends(get_supabase)
+    request: Request,
+    since: Optional[int] = None,
+    supabase: Client = Depends(get_supabase),
 ):
     """
     Get warnings from the database.
 
+    Responses are cached in Redis for SUMMARY_CACHE_TTL seconds per cache
+    version and `since` value, and carry an ETag so polling clients can
+    revalidate cheaply.
+
     Args:
+        request: Incoming request, checked for If-None-Match
         since: Unix timestamp to filter warnings created after this time
         supabase: Supabase client dependency
 
     Returns:
         List of warning records from the database
     """
+    scope = "all" if since is None else since
+    version = None
+    body = None
+    try:
+        redis = await get_redis()
+        lookup = redis.register_script(SUMMARY_CACHE_LOOKUP)
+        version, body = await lookup(
+            keys=[SUMMARY_VERSION_KEY], args=[SUMMARY_CACHE_PREFIX, scope]
+        )
+    except Exception as e:
+        # the cache is best-effort, the database can still answer
+        logging.warning(f"Summary cache lookup failed: {e!r}")
+
     try:
-        query = supabase.table("flagged_events").select("*")
-        if since is not None:
-            since_datetime = datetime.fromtimestamp(since).isoformat()
-            query = query.gt("created_at", since_datetime)
-        query = query.order("created_at", desc=True)
+        if body is None:
+            query = supabase.table("flagged_events").select("*")
+            if since is not None:
+                since_datetime = timestamp_to_iso(since)
+                query = query.gt("created_at", since_datetime)
+            query = query.order("created_at", desc=True)
+
+            response = await asyncio.to_thread(query.execute)
+
+            body = orjson.dumps({"data": response.data, "count": len(response.data)})
+            if version is not None:
+                try:
+                    await redis.setex(
+                        f"{SUMMARY_CACHE_PREFIX}{version}:{scope}",
+                        SUMMARY_CACHE_TTL,
+                        body,
+                    )
+                except Exception as e:
+                    logging.warning(f"Summary cache write failed: {e!r}")
+
+        if isinstance(body, str):
+            body = body.encode()
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {
+            "Cache-Control": f"public, max-age={SUMMARY_CACHE_TTL}",
+            "ETag": etag,
+        }
 
-        response = query.execute()
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-        return {"data": response.data, "count": len(response.data)}
+        return Response(content=body, media_type="application/json", headers=headers)
 
     except Exception as e:
         raise HTTPException(
@@ -76,32 +167,59 @@ async def list_summaries(
 
 
 class Analysis(BaseModel):
+    # strict structured outputs require additionalProperties: false
+    model_config = ConfigDict(extra="forbid")
+
     root_cause: List[str]
     impact: List[str]
     next_steps: List[str]
 
 
-async def analyze_warning(warning_type: str, payload: dict, warning_id: int) -> dict:
-    """
-    Analyze a warning and return analysis results using OpenAI.
+class BatchAnalysisItem(Analysis):
+    index: int
 
-    Args:
-        warning_type: Type of warning
-        payload: Warning payload data
-        warning_id: ID of the warning
 
-    Returns:
-        Dict containing original payload and AI analysis
-    """
-    client = get_openai_client()
+class BatchAnalysis(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[BatchAnalysisItem]
+
+
+# structured output format, generated once instead of by the SDK on every call
+BATCH_ANALYSIS_FORMAT = {
+    "type": "json_schema",
+    "name": "BatchAnalysis",
+    "schema": BatchAnalysis.model_json_schema(),
+    "strict": True,
+}
+
+
+# max number of warnings sent to OpenAI in a single prompt
+ANALYSIS_BATCH_SIZE = 8
+# max number of stream entries drained per xread
+STREAM_READ_COUNT = 64
+# max number of in-flight OpenAI requests, to stay under the RPM limit
+_openai_semaphore = asyncio.Semaphore(48)
+
+# model warnings are escalated to when the first pass fails, and the cheaper
+# model used for the first pass of any warning type not listed below
+ANALYSIS_MODEL = os.environ.get("ANALYSIS_MODEL", "gpt-4o-mini")
+ANALYSIS_FAST_MODEL = os.environ.get("ANALYSIS_FAST_MODEL", "gpt-4.1-nano")
+# critical incidents skip the fast model and go straight to ANALYSIS_MODEL
+WARNING_TYPE_MODELS = {
+    "Default branch deleted": ANALYSIS_MODEL,
+    "Repository visibility changed to public": ANALYSIS_MODEL,
+}
 
-    # Construct the comprehensive prompt
-    prompt = f"""You are a GitHub security and DevOps expert analyzing repository events that may pose risks. 
+# redis key prefix and TTL (seconds) for memoized analyses
+ANALYSIS_CACHE_PREFIX = "analysis:"
+ANALYSIS_CACHE_TTL = 86400
 
-You will be given a warning type and the corresponding GitHub event payload. Analyze the event and provide your assessment in the structured format.
 
-Warning Type: {warning_type}
-Event Payload: {json.dumps(payload, indent=2)}
+# static system prompt, kept constant so OpenAI can cache it as a shared prefix
+ANALYSIS_INSTRUCTIONS = """You are a GitHub security and DevOps expert analyzing repository events that may pose risks. 
+
+You will be given a JSON array of warnings in the user message. Each warning has an index, a warning type and the corresponding GitHub event payload. Analyze each event independently and provide your assessment in the structured format, returning exactly one item per warning with the same index.
 
 Analysis Guidelines:
 
@@ -144,88 +262,515 @@ Instructions:
 - Focus on practical, real-world concerns
 - Avoid generic responses - tailor to the specific event type and payload details when available"""
 
-    try:
-        response = client.responses.parse(
-            model="gpt-4o-mini",
-            input=[{"role": "user", "content": prompt}],
-            text_format=Analysis,
-        )
 
-        analysis: Analysis = response.output_parsed
-
-        return {
-            "payload": payload,
-            "analysis": {
-                "root_cause": analysis.root_cause,
-                "impact": analysis.impact,
-                "next_steps": analysis.next_steps,
-            },
-            "warning_id": warning_id,
-            "warning_type": warning_type,
-            "is_ping": False,
-        }
+# payload fields kept in the prompt for each GitHub event type; any other type
+# keeps only "action"
+PROMPT_PAYLOAD_FIELDS = {
+    "PushEvent": ("ref", "size", "distinct_size"),
+    "DeleteEvent": ("ref", "ref_type"),
+    "CreateEvent": ("ref", "ref_type", "master_branch"),
+    "PublicEvent": (),
+    "MemberEvent": ("action",),
+}
 
-    except Exception as e:
-        print(e)
-        # Fallback to mock data if OpenAI fails
-        mock_analysis = {
+
+def slim_payload(event: dict) -> dict:
+    """
+    Project a GitHub event down to the fields the analysis prompt needs.
+
+    Dummy warnings can be raised for any event type, so the projection is keyed
+    by the event type rather than the warning type.
+
+    Args:
+        event: GitHub event exactly as returned by the Events API
+
+    Returns:
+        Dict with the actor, repo and relevant payload fields of the event
+    """
+    etype = event.get("type")
+    payload = event.get("payload") or {}
+
+    slim_event = {
+        "type": etype,
+        "actor": (event.get("actor") or {}).get("login"),
+        "repo": (event.get("repo") or {}).get("name"),
+        "org": (event.get("org") or {}).get("login"),
+        "public": event.get("public"),
+    }
+
+    fields = PROMPT_PAYLOAD_FIELDS.get(etype, ("action",))
+    slim_event["payload"] = {
+        field: payload[field] for field in fields if field in payload
+    }
+    if etype == "PushEvent":
+        slim_event["payload"]["commits"] = [
+            {
+                "author": (commit.get("author") or {}).get("name"),
+                "message": commit.get("message"),
+            }
+            for commit in payload.get("commits", [])
+        ]
+    elif etype == "MemberEvent":
+        slim_event["payload"]["member"] = (payload.get("member") or {}).get("login")
+
+    return slim_event
+
+
+def build_result(warning: dict, analysis: Optional[dict] = None) -> dict:
+    """
+    Build the SSE message for an analyzed warning.
+
+    Args:
+        warning: Queue message with a warning_id, type and event_payload
+        analysis: AI analysis, or None to fall back to mock data
+
+    Returns:
+        Dict containing original payload and AI analysis
+    """
+    if analysis is None:
+        analysis = {
             "root_cause": ["Analysis service temporarily unavailable"],
             "impact": ["Unable to assess risk level"],
             "next_steps": ["Retry analysis", "Manual review recommended"],
         }
 
-        return {
-            "payload": payload,
-            "analysis": mock_analysis,
-            "warning_id": warning_id,
-            "warning_type": warning_type,
-            "is_ping": False,
+    return {
+        "payload": warning["event_payload"],
+        "analysis": analysis,
+        "warning_id": warning["warning_id"],
+        "warning_type": warning["type"],
+        "is_ping": False,
+    }
+
+
+def analysis_cache_key(warning: dict) -> str:
+    """
+    Redis key for a warning's analysis, derived from exactly what the model sees.
+
+    Args:
+        warning: Queue message with a warning_id, type and event_payload
+
+    Returns:
+        Cache key shared by warnings with identical type and projected payload
+    """
+    content = orjson.dumps([warning["type"], slim_payload(warning["event_payload"])])
+    return ANALYSIS_CACHE_PREFIX + hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+async def analyze_warnings(warnings: List[dict], model: str) -> List[Optional[dict]]:
+    """
+    Analyze a batch of warnings with a single OpenAI call.
+
+    Args:
+        warnings: Queue messages, each with a warning_id, type and event_payload
+        model: OpenAI model to analyze the batch with
+
+    Returns:
+        AI analysis of each warning in the same order as the warnings, or None
+        for any warning OpenAI failed to analyze or answered with empty lists
+    """
+    client = get_openai_client()
+
+    items = [
+        {
+            "index": index,
+            "warning_type": warning["type"],
+            "payload": slim_payload(warning["event_payload"]),
+        }
+        for index, warning in enumerate(warnings)
+    ]
+
+    # only the per-batch warnings vary between calls
+    prompt = orjson.dumps(items).decode()
+
+    analyses = {}
+    try:
+        async with _openai_semaphore:
+            response = await client.responses.create(
+                model=model,
+                input=[
+                    {"role": "system", "content": ANALYSIS_INSTRUCTIONS},
+                    {"role": "user", "content": prompt},
+                ],
+                text={"format": BATCH_ANALYSIS_FORMAT},
+            )
+
+        batch = BatchAnalysis.model_validate_json(response.output_text)
+        for item in batch.items:
+            if not (item.root_cause and item.impact and item.next_steps):
+                continue
+            analyses[item.index] = {
+                "root_cause": item.root_cause,
+                "impact": item.impact,
+                "next_steps": item.next_steps,
+            }
+
+    except Exception:
+        logging.exception(f"Failed to analyze a batch of {len(warnings)} warnings")
+
+    return [analyses.get(index) for index in range(len(warnings))]
+
+
+async def analyze_in_batches(warnings: List[dict], model: str) -> List[Optional[dict]]:
+    """
+    Analyze warnings in concurrent row-marshaled batches.
+
+    Args:
+        warnings: Queue messages, each with a warning_id, type and event_payload
+        model: OpenAI model to analyze the warnings with
+
+    Returns:
+        AI analysis of each warning in the same order as the warnings, or None
+        for any warning OpenAI failed to analyze
+    """
+    batches = [
+        warnings[i : i + ANALYSIS_BATCH_SIZE]
+        for i in range(0, len(warnings), ANALYSIS_BATCH_SIZE)
+    ]
+    results = await asyncio.gather(
+        *[analyze_warnings(batch, model) for batch in batches],
+        return_exceptions=True,
+    )
+
+    analyses = []
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            logging.error(result)
+            result = [None] * len(batch)
+        analyses.extend(result)
+
+    return analyses
+
+
+def save_analyses(supabase: Client, analyses: List[dict]) -> None:
+    """
+    Write a batch of analyses back to the database in a single upsert.
+
+    Args:
+        supabase: Supabase client
+        analyses: Results built by build_result
+    """
+    updates = [
+        {
+            "id": analysis["warning_id"],
+            "root_cause": analysis["analysis"]["root_cause"],
+            "impact": analysis["analysis"]["impact"],
+            "next_steps": analysis["analysis"]["next_steps"],
+            "has_been_processed": True,
         }
+        for analysis in analyses
+    ]
+    supabase.table("flagged_events").upsert(updates, on_conflict="id").execute()
+
+
+# consumer group shared by every analysis worker, so each warning is analyzed once
+ANALYSIS_GROUP = "analyzers"
+ANALYSIS_CONSUMER = f"{socket.gethostname()}-{os.getpid()}"
+# ms an entry may stay unacknowledged before another worker reclaims it
+RECLAIM_IDLE_MS = 60_000
+# seconds between scans for entries left pending by a crashed worker
+RECLAIM_INTERVAL = 30
+# deliveries after which an entry that keeps failing is given up on
+MAX_DELIVERIES = 5
+# stream entries that couldn't be analyzed are moved to, for manual review
+DEAD_LETTER_QUEUE = f"{WARNING_QUEUE}:dead"
+
+
+async def dead_letter_entries(
+    redis: aioredis.Redis, entries: List[tuple], reason: str
+) -> None:
+    """
+    Move warning queue entries to the dead letter stream and acknowledge them.
 
+    Args:
+        redis: Redis client
+        entries: (entry_id, fields) pairs that can't be analyzed
+        reason: Why the entries were given up on
+    """
+    logging.error(f"Dead-lettering {len(entries)} warning queue entries: {reason}")
+    pipe = redis.pipeline(transaction=False)
+    for entry_id, fields in entries:
+        pipe.xadd(
+            DEAD_LETTER_QUEUE,
+            {**fields, "entry_id": entry_id, "reason": reason},
+            maxlen=10_000,
+            approximate=True,
+        )
+    pipe.xack(WARNING_QUEUE, ANALYSIS_GROUP, *[entry_id for entry_id, _ in entries])
+    await pipe.execute()
 
-async def stream_reader(request: Request):
+
+async def process_entries(
+    redis: aioredis.Redis, supabase: Client, entries: List[tuple]
+) -> List[dict]:
     """
-    Yield new messages forever without popping from the queueu.
+    Analyze a drained set of warning queue entries and acknowledge them.
+
+    Args:
+        redis: Redis client
+        supabase: Supabase client
+        entries: (entry_id, fields) pairs read from the warning queue
+
+    Returns:
+        Results built by build_result, in stream order
+    """
+    # a malformed message would fail the whole batch forever, so set it aside
+    parsed, warnings, cache_keys, malformed = [], [], [], []
+    for entry in entries:
+        try:
+            warning = orjson.loads(entry[1]["message"])
+            cache_key = analysis_cache_key(warning)
+            build_result(warning)
+        except Exception:
+            malformed.append(entry)
+            continue
+        parsed.append(entry)
+        warnings.append(warning)
+        cache_keys.append(cache_key)
+
+    if malformed:
+        await dead_letter_entries(redis, malformed, "malformed message")
+    if not parsed:
+        return []
+
+    # reuse earlier analyses of identical warnings, and only send the rest to OpenAI
+    cached = await redis.mget(cache_keys)
+    analyses = [orjson.loads(value) if value else None for value in cached]
+    misses = [index for index, analysis in enumerate(analyses) if analysis is None]
+
+    # first pass with each warning type's model
+    tiers: Dict[str, List[int]] = {}
+    for index in misses:
+        model = WARNING_TYPE_MODELS.get(warnings[index]["type"], ANALYSIS_FAST_MODEL)
+        tiers.setdefault(model, []).append(index)
+
+    tier_results = await asyncio.gather(
+        *[
+            analyze_in_batches([warnings[index] for index in indices], model)
+            for model, indices in tiers.items()
+        ]
+    )
+
+    escalated = []
+    for (model, indices), result in zip(tiers.items(), tier_results):
+        for index, analysis in zip(indices, result):
+            analyses[index] = analysis
+            if analysis is None and model != ANALYSIS_MODEL:
+                escalated.append(index)
+
+    # retry anything the cheaper model failed on with ANALYSIS_MODEL
+    if escalated:
+        result = await analyze_in_batches(
+            [warnings[index] for index in escalated], ANALYSIS_MODEL
+        )
+        for index, analysis in zip(escalated, result):
+            analyses[index] = analysis
+
+    pipe = redis.pipeline(transaction=False)
+    for index in misses:
+        if analyses[index] is not None:
+            pipe.setex(
+                cache_keys[index], ANALYSIS_CACHE_TTL, orjson.dumps(analyses[index])
+            )
+    await pipe.execute()
+
+    # Fallback to mock data for any warning OpenAI failed to analyze
+    results = [
+        build_result(warning, analysis) for warning, analysis in zip(warnings, analyses)
+    ]
+
+    await asyncio.to_thread(save_analyses, supabase, results)
+    await invalidate_summary_cache(redis)
+
+    # only acknowledge once the analyses are stored, so a crash before this
+    # point leaves the entries pending for another worker to reclaim
+    await redis.xack(
+        WARNING_QUEUE, ANALYSIS_GROUP, *[entry_id for entry_id, _ in parsed]
+    )
+    return results
+
+
+async def reclaim_entries(redis: aioredis.Redis) -> List[tuple]:
     """
-    redis = await get_redis()
-    supabase = get_supabase()
-    last_id = "0-0"
+    Claim warning queue entries another consumer left unacknowledged, dead
+    lettering those that already failed MAX_DELIVERIES times.
 
-    while True:
+    Args:
+        redis: Redis client
 
-        if await request.is_disconnected():
-            break
+    Returns:
+        (entry_id, fields) pairs now owned by this consumer
+    """
+    result = await redis.xautoclaim(
+        WARNING_QUEUE,
+        ANALYSIS_GROUP,
+        ANALYSIS_CONSUMER,
+        min_idle_time=RECLAIM_IDLE_MS,
+        count=STREAM_READ_COUNT,
+    )
+    # entries trimmed from the stream while pending come back without fields
+    entries = [(entry_id, fields) for entry_id, fields in result[1] if fields]
+    if not entries:
+        return entries
+
+    pending = await redis.xpending_range(
+        WARNING_QUEUE,
+        ANALYSIS_GROUP,
+        min=entries[0][0],
+        max=entries[-1][0],
+        count=len(entries),
+        consumername=ANALYSIS_CONSUMER,
+    )
+    deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+
+    exhausted = [
+        entry for entry in entries if deliveries.get(entry[0], 0) > MAX_DELIVERIES
+    ]
+    if exhausted:
+        await dead_letter_entries(
+            redis, exhausted, f"failed {MAX_DELIVERIES} deliveries"
+        )
+    return [entry for entry in entries if deliveries.get(entry[0], 0) <= MAX_DELIVERIES]
 
-        results = await redis.xread(
-            {WARNING_QUEUE: last_id},
-            count=1,
-            block=500,
+
+async def create_analysis_group(redis: aioredis.Redis, start_id: str = "$") -> None:
+    """
+    Create the analysis consumer group, unless another worker already has.
+
+    Args:
+        redis: Redis client
+        start_id: Stream ID the group starts reading after
+    """
+    try:
+        await redis.xgroup_create(
+            WARNING_QUEUE, ANALYSIS_GROUP, id=start_id, mkstream=True
         )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
 
+
+async def analysis_worker():
+    """
+    Analyze warnings from the queue forever and publish the results for SSE clients.
+    """
+    redis = None
+    supabase = None
+    loop = asyncio.get_running_loop()
+    next_reclaim = loop.time()
+    group_created = False
+    group_start_id = "$"
+
+    while True:
         try:
-            if results:
-                ((_, entries),) = results
-                last_id, fields = entries[0]
-                data = json.loads(fields[b"message"].decode())
-                analysis = await analyze_warning(
-                    data["type"], data["event_payload"], data["warning_id"]
+            # acquired in here, so missing config is retried instead of killing the task
+            if supabase is None:
+                redis = await get_redis()
+                supabase = get_supabase()
+
+            if not group_created:
+                await create_analysis_group(redis, group_start_id)
+                group_created = True
+
+            entries = []
+            if loop.time() >= next_reclaim:
+                entries = await reclaim_entries(redis)
+                next_reclaim = loop.time() + RECLAIM_INTERVAL
+
+            if not entries:
+                results = await redis.xreadgroup(
+                    ANALYSIS_GROUP,
+                    ANALYSIS_CONSUMER,
+                    {WARNING_QUEUE: ">"},
+                    count=STREAM_READ_COUNT,
+                    block=500,
                 )
-                supabase.table("flagged_events").update(
-                    {
-                        "root_cause": analysis["analysis"]["root_cause"],
-                        "impact": analysis["analysis"]["impact"],
-                        "next_steps": analysis["analysis"]["next_steps"],
-                        "has_been_processed": True,
-                    }
-                ).eq("id", data["warning_id"]).execute()
-                response = json.dumps(analysis)
-                yield f"{response}"
-            else:
-                response = {"is_ping": True}
-                yield f"{json.dumps(response)}"
+                if results:
+                    ((_, entries),) = results
+
+            if entries:
+                analyses = await process_entries(redis, supabase, entries)
+                pipe = redis.pipeline(transaction=False)
+                for analysis in analyses:
+                    pipe.publish(ANALYSIS_CHANNEL, orjson.dumps(analysis))
+                await pipe.execute()
+        except ResponseError as e:
+            # the stream was recreated without the group, e.g. after a Redis restart
+            if "NOGROUP" in str(e):
+                # start from the beginning, so entries queued since aren't skipped
+                group_created = False
+                group_start_id = "0"
+            logging.error(e)
+            await asyncio.sleep(1)
         except Exception as e:
             logging.error(e)
-            yield f"error: {str(e)}"
+            await asyncio.sleep(1)
+
+
+# queues of the connected SSE clients, fed by this process's single subscriber
+_stream_clients: Set[asyncio.Queue] = set()
+# analyses buffered per client; a client this far behind misses new ones
+STREAM_CLIENT_QUEUE_SIZE = 100
+
+
+async def analysis_fanout():
+    """
+    Relay analyses published on ANALYSIS_CHANNEL to every connected SSE client.
+
+    One pub/sub connection serves the whole process, so the number of open
+    streams doesn't eat into the shared Redis connection pool.
+    """
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis()
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(ANALYSIS_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                for queue in _stream_clients:
+                    try:
+                        queue.put_nowait(message["data"])
+                    except asyncio.QueueFull:
+                        pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(e)
+            await asyncio.sleep(1)
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+
+async def stream_reader(request: Request):
+    """
+    Yield analyzed warnings forever as the analysis worker publishes them.
+    """
+    queue = asyncio.Queue(maxsize=STREAM_CLIENT_QUEUE_SIZE)
+    _stream_clients.add(queue)
+
+    try:
+        while True:
+            try:
+                # waiting on the queue costs nothing while the client is idle
+                data = await asyncio.wait_for(queue.get(), timeout=30)
+                yield f"{data}"
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            # only check for a disconnect once the wait times out; sse_starlette
+            # also cancels the stream as soon as the client goes away
+            if await request.is_disconnected():
+                break
+
+            response = {"is_ping": True}
+            yield f"{orjson.dumps(response).decode()}"
+    finally:
+        _stream_clients.discard(queue)
 
 
 @app.get("/stream")
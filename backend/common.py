@@ -7,6 +7,15 @@ from fastapi import HTTPException, status
 # redis key for the warning queue
 WARNING_QUEUE = "warning_queue_4"
 
+# redis pubsub channel analyzed warnings are fanned out to SSE clients on
+ANALYSIS_CHANNEL = "warnings_fanout"
+
+# redis key prefix for cached /summary responses
+SUMMARY_CACHE_PREFIX = "summary:"
+# bumped on every write, so cached responses of older versions are never read
+# again and simply expire
+SUMMARY_VERSION_KEY = "summary:version"
+
 # supabase singleton
 _supabase_client: Optional[Client] = None
 
@@ -29,8 +38,9 @@ def get_supabase() -> Client:
     return _supabase_client
 
 
-# redis singleton
+# redis singleton, backed by a shared connection pool
 _redis_client: Optional[aioredis.Redis] = None
+REDIS_MAX_CONNECTIONS = 50
 
 
 async def get_redis() -> aioredis.Redis:
@@ -38,6 +48,16 @@ async def get_redis() -> aioredis.Redis:
 
     if _redis_client is None:
         redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
-        _redis_client = await aioredis.Redis.from_url(redis_url)
+        pool = aioredis.ConnectionPool.from_url(
+            redis_url, max_connections=REDIS_MAX_CONNECTIONS, decode_responses=True
+        )
+        _redis_client = aioredis.Redis(connection_pool=pool)
 
     return _redis_client
+
+
+async def invalidate_summary_cache(redis: aioredis.Redis) -> None:
+    """
+    Move /summary to a new cache version so the next request hits the database.
+    """
+    await redis.incr(SUMMARY_VERSION_KEY)
@@ -1,14 +1,34 @@
 import asyncio
-import json
-from typing import Dict, List, Tuple, Optional, Any
+import random
+import re
 import time
-import requests
-from requests.models import Response
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+import aiohttp
+import ijson
+import orjson
+from postgrest.types import ReturnMethod
+import uvloop
+from yarl import URL
+from redis.exceptions import ResponseError
 from common import get_redis, get_supabase, WARNING_QUEUE
+from common import invalidate_summary_cache
 from dotenv import load_dotenv
 import os
 import traceback
 import logging
+from logging.handlers import RotatingFileHandler
+from types import MappingProxyType
 
 load_dotenv()
 
@@ -21,10 +41,120 @@ logger = logging.getLogger(__name__)
 
 GITHUB_ENDPOINT = "https://api.github.com/events?per_page=100&page=2"
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+# sent with every GitHub request by the shared session
+HEADERS = MappingProxyType(
+    {
+        "Authorization": f"Bearer {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+)
 LAST_EVENT_ID_KEY = "last_processed_event_id"
-
-DEFAULT_BRANCHES = {"refs/heads/main", "refs/heads/master"}
+# redis key prefix for the ETag / Last-Modified of the last response per URL
+VALIDATORS_KEY_PREFIX = "gh:validators:"
+# redis hash holding the last seen rate limit quota, shared by every poller
+RATE_LIMIT_KEY = "gh:ratelimit"
+# remaining requests at which we stop and wait for the quota to reset
+RATE_LIMIT_THRESHOLD = 50
+# daily filters of flagged event ids already queued, checked across poll cycles
+SEEN_EVENTS_KEY_PREFIX = "gh:events:seen:"
+SEEN_EVENTS_CAPACITY = 1_000_000
+SEEN_EVENTS_ERROR_RATE = 0.001
+# keep yesterday's filter around so dedup spans the day boundary
+SEEN_EVENTS_TTL = 2 * 86400
+
+DEFAULT_BRANCHES = frozenset({"refs/heads/main", "refs/heads/master"})
+DEFAULT_BRANCH_NAMES = frozenset({"main", "master"})
 LARGE_PUSH_THRESHOLD = 100
+# one in this many event ids is flagged as a dummy warning
+_DUMMY_MOD = 15
+
+# debug log of every event seen, one JSON object per line, rotated at 100MB
+EVENTS_LOG_PATH = "events.txt"
+EVENTS_LOG_MAX_BYTES = 100 * 1024 * 1024
+EVENTS_LOG_BACKUPS = 5
+# lines waiting to be written; new lines are dropped while it's full
+EVENTS_LOG_QUEUE_SIZE = 10_000
+# lines per write, and how long the writer waits for more when under that
+EVENTS_LOG_BATCH_SIZE = 1000
+EVENTS_LOG_FLUSH_INTERVAL = 1.0
+
+# whether the server has RedisBloom, otherwise the filters are plain sets
+_bloom_available = True
+
+# the rel="last" link in a Link header
+_LINK_LAST_RE = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+# max number of follow-up pages requested at once
+PAGE_FETCH_CONCURRENCY = 4
+# bounds on connecting and on each socket read, so a stalled connection gets
+# retried; there is no total bound, as page bodies are streamed only once the
+# pages before them are processed
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+# retry backoff: delay drawn uniformly up to min(cap, base * 2**attempt)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+MAX_REQUEST_ATTEMPTS = 6
+# longest we'll wait on a server-announced retry time, in seconds
+MAX_RETRY_WAIT = 900.0
+# rate limited or transient server errors, worth another attempt
+RETRY_STATUSES = frozenset({403, 429, 500, 502, 503, 504})
+
+
+def _check_push(payload: Dict[str, Any]) -> str:
+    # push event :contentReference[oaicite:6]{index=6}
+    warning_type = ""
+    size = payload.get("size", 0)  # size field :contentReference[oaicite:7]{index=7}
+    if payload.get("ref") in DEFAULT_BRANCHES:
+        warning_type = "Push to default branch"
+    if isinstance(size, int) and size > LARGE_PUSH_THRESHOLD:
+        warning_type = "Large push to default branch"
+    return warning_type
+
+
+def _check_delete(payload: Dict[str, Any]) -> str:
+    # delete event :contentReference[oaicite:8]{index=8}
+    if payload.get("ref_type") == "branch":
+        if payload.get("ref") in DEFAULT_BRANCH_NAMES:
+            return "Default branch deleted"
+    return ""
+
+
+def _check_public(payload: Dict[str, Any]) -> str:
+    # repo made public :contentReference[oaicite:9]{index=9}
+    return "Repository visibility changed to public"
+
+
+def _check_member(payload: Dict[str, Any]) -> str:
+    # collaborator changes :contentReference[oaicite:10]{index=10}
+    if payload.get("action") == "added":
+        return "New collaborator added"
+    return ""
+
+
+# per event type check, returning the warning type or "" if nothing is wrong
+_CHECKS = {
+    "PushEvent": _check_push,
+    "DeleteEvent": _check_delete,
+    "PublicEvent": _check_public,
+    "MemberEvent": _check_member,
+}
+# event types any check looks at; the rest of the firehose is never flagged
+_INTERESTING = frozenset(_CHECKS)
+
+
+def is_dummy_event(event_id: Optional[str]) -> bool:
+    """
+    Whether an event gets a dummy warning, so a feed of events appears on the
+    frontend.
+
+    Args:
+        event_id: GitHub event ID
+
+    Returns:
+        True for one in every _DUMMY_MOD event ids
+    """
+    return (int(event_id) if event_id and event_id.isdigit() else 0) % _DUMMY_MOD == 0
 
 
 def should_flag_event(event: Dict[str, Any]) -> Tuple[bool, str]:
@@ -42,99 +172,378 @@ def should_flag_event(event: Dict[str, Any]) -> Tuple[bool, str]:
     List[str]
         Zero or more warning strings.
     """
-    etype = event.get("type")
-    payload = event.get("payload", {})
-    warning_type = ""
-
-    # ---------- PushEvent checks ----------
-    if etype == "PushEvent":  # push event :contentReference[oaicite:6]{index=6}
-        ref = payload.get("ref")
-        size = payload.get(
-            "size", 0
-        )  # size field :contentReference[oaicite:7]{index=7}
-        if ref in DEFAULT_BRANCHES:
-            warning_type = "Push to default branch"
-        if isinstance(size, int) and size > LARGE_PUSH_THRESHOLD:
-            warning_type = "Large push to default branch"
-
-    # ---------- DeleteEvent checks ----------
-    elif etype == "DeleteEvent":  # delete event :contentReference[oaicite:8]{index=8}
-        if payload.get("ref_type") == "branch":
-            if payload.get("ref") in {"main", "master"}:
-                warning_type = "Default branch deleted"
-
-    # ---------- PublicEvent checks ----------
-    elif (
-        etype == "PublicEvent"
-    ):  # repo made public :contentReference[oaicite:9]{index=9}
-        warning_type = "Repository visibility changed to public"
-
-    # ---------- MemberEvent checks ----------
-    elif (
-        etype == "MemberEvent"
-    ):  # collaborator changes :contentReference[oaicite:10]{index=10}
-        if payload.get("action") == "added":
-            warning_type = "New collaborator added"
+    check = _CHECKS.get(event.get("type"))
+    warning_type = check(event.get("payload", {})) if check else ""
 
     # to ensure a feed of events appears on the frontend, we add some dummy events
-    if int(event.get("id", "0")) % 15 == 0:
+    if not warning_type and is_dummy_event(event.get("id")):
         warning_type = "Dummy warning"
 
-    logging.info(f"Warning type: {warning_type}")
+    logger.debug("Warning type: %s", warning_type)
 
     return warning_type != "", warning_type
 
 
-def make_github_request(
-    url: str, headers: Dict[str, str], backoff_time: float = 1.0
-) -> Optional[Response]:
+async def get_conditional_headers(url: str) -> Dict[str, str]:
+    """
+    Build conditional request headers from the last response seen for a URL.
+
+    Args:
+        url: GitHub API endpoint URL
+
+    Returns:
+        If-None-Match / If-Modified-Since headers, empty if the URL hasn't been seen
+    """
+    redis = await get_redis()
+    validators = await redis.hgetall(f"{VALIDATORS_KEY_PREFIX}{url}")
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def queue_validators(pipe, response: aiohttp.ClientResponse) -> None:
+    """
+    Queue a write of a response's ETag / Last-Modified, for the next request to
+    its URL.
+
+    Args:
+        pipe: Redis pipeline the writes are queued on
+        response: Successful response for a page whose events were stored
+    """
+    validators = {
+        field: response.headers[header]
+        for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in response.headers
+    }
+    if not validators:
+        return
+
+    # outlive a few polls, so stale validators for pages that moved expire on their own
+    ttl = int(response.headers.get("X-Poll-Interval", 60)) * 4
+
+    key = f"{VALIDATORS_KEY_PREFIX}{response.url}"
+    pipe.hset(key, mapping=validators)
+    pipe.expire(key, ttl)
+
+
+async def wait_for_rate_limit() -> None:
+    """
+    Sleep until the quota resets if the last response said it's nearly used up.
+    """
+    redis = await get_redis()
+    quota = await redis.hgetall(RATE_LIMIT_KEY)
+    if not quota or int(quota["remaining"]) > RATE_LIMIT_THRESHOLD:
+        return
+
+    delay = max(0.0, int(quota["reset"]) - time.time()) + random.uniform(0, 2)
+    delay = min(MAX_RETRY_WAIT, delay)
+    logger.warning(
+        f"Only {quota['remaining']} GitHub requests left, waiting {delay:.2f}s for reset"
+    )
+    await asyncio.sleep(delay)
+
+
+async def record_rate_limit(response: aiohttp.ClientResponse) -> None:
+    """
+    Share the quota announced by a response with every poller.
+
+    Args:
+        response: Any response from the GitHub API
+    """
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.hset(RATE_LIMIT_KEY, mapping={"remaining": remaining, "reset": reset})
+    # the quota is meaningless once it has reset
+    pipe.expireat(RATE_LIMIT_KEY, int(reset))
+    await pipe.execute()
+
+
+def jittered_backoff(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff, so replicas don't retry in lockstep.
+
+    Args:
+        attempt: Zero-based number of the attempt that just failed
+
+    Returns:
+        Delay in seconds
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def get_retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
     """
-    Make a request to the GitHub Events API with exponential backoff.
+    Work out how long to wait before retrying a response in RETRY_STATUSES.
 
     Args:
+        response: The rate limited or failed response
+        attempt: Zero-based number of the attempt that just failed
+
+    Returns:
+        Delay in seconds, from Retry-After or X-RateLimit-Reset when GitHub
+        announces one, otherwise full-jitter exponential backoff
+    """
+    retry_after = response.headers.get("Retry-After")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if retry_after and retry_after.isdigit():
+        delay = float(retry_after)
+    elif response.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        delay = max(0.0, int(reset) - time.time())
+    else:
+        return jittered_backoff(attempt)
+
+    # jitter so replicas waiting on the same reset don't retry together
+    return min(MAX_RETRY_WAIT, delay + random.uniform(0, BACKOFF_BASE))
+
+
+async def make_github_request(
+    session: aiohttp.ClientSession, url: str
+) -> Optional[aiohttp.ClientResponse]:
+    """
+    Make a conditional request to the GitHub Events API, retrying after the
+    time GitHub asks for or with full-jitter exponential backoff.
+
+    Args:
+        session: Shared HTTP session carrying the auth headers
         url: GitHub API endpoint URL
-        headers: Request headers including auth token
-        backoff_time: Current backoff time in seconds
 
     Returns:
-        Response object if successful, None if 304 Not Modified
+        Response object with its body still unread if successful, and already
+        released if 304 Not Modified; the caller streams the body and closes the
+        response. None if every attempt failed or GitHub answered with a status
+        that won't change on retry.
     """
     logger.info(f"Making GitHub API request to: {url}")
+    headers = await get_conditional_headers(url)
 
-    while True:
+    for attempt in range(MAX_REQUEST_ATTEMPTS):
         try:
-            response = requests.get(url, headers=headers)
+            await wait_for_rate_limit()
+            response = await session.get(url, headers=headers)
+            try:
+                await record_rate_limit(response)
+                if response.status == 304:
+                    logger.info("No new events (304 Not Modified)")
+                    response.release()
+                    return response
+
+                if response.status == 200:
+                    logger.info("Successfully fetched events")
+                    return response
+
+                if response.status not in RETRY_STATUSES:
+                    # an error body, not a page of events to stream
+                    logger.error(f"GitHub API returned {response.status} for {url}")
+                    response.release()
+                    return None
+            except BaseException:
+                # don't let a failed response hold on to a pooled connection
+                response.close()
+                raise
+
+            response.release()
+            delay = get_retry_delay(response, attempt)
+            logger.warning(f"GitHub API returned {response.status} for {url}")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            delay = jittered_backoff(attempt)
+            logger.error(f"Request failed: {e!r}")
+
+        # no point waiting out a delay there is no attempt left to use
+        if attempt < MAX_REQUEST_ATTEMPTS - 1:
+            logger.info(f"Backing off for {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    logger.error(f"Giving up on {url} after {MAX_REQUEST_ATTEMPTS} attempts")
+    return None
+
+
+async def prepend_event(
+    first_event: Dict, events: AsyncIterator[Dict]
+) -> AsyncIterator[Dict]:
+    """
+    Yield an already read event followed by the rest of the page.
 
-            if response.status_code == 304:
-                logger.info("No new events (304 Not Modified)")
-                return None
+    Args:
+        first_event: Event read off the front of the page
+        events: Rest of the page's events
+    """
+    yield first_event
+    async for event in events:
+        yield event
 
-            if response.status_code in (403, 503):
-                logger.warning(
-                    f"Rate limited or service unavailable ({response.status_code}), backing off for {backoff_time}s"
-                )
-                time.sleep(backoff_time)
-                backoff_time *= 2
-                continue
 
-            logger.info(f"Successfully fetched events (status: {response.status_code})")
-            return response
+async def iter_events(
+    response: aiohttp.ClientResponse,
+) -> Optional[AsyncIterator[Dict]]:
+    """
+    Parse a page of events as it streams in off the socket, so nothing past
+    where iteration stops is read or parsed.
+
+    Args:
+        response: Open response for the page, its body unread
+
+    Returns:
+        Iterator over the page's events, None if the page has no events
+    """
+    events = aiter(ijson.items_async(response.content, "item", use_float=True))
+    first_event = await anext(events, None)
+    if first_event is None:
+        return None
+
+    return prepend_event(first_event, events)
+
+
+def close_responses(responses: Iterable[Optional[aiohttp.ClientResponse]]) -> None:
+    """
+    Drop the connections of pages that won't be processed, unread bodies and all.
+
+    Args:
+        responses: Responses to close, None entries are skipped
+    """
+    for response in responses:
+        if response is not None:
+            response.close()
+
+
+def close_prefetched_pages(task: asyncio.Task) -> None:
+    """
+    Done callback closing the pages of a prefetch that won't be processed.
+
+    Args:
+        task: Finished fetch_pages task
+    """
+    if task.cancelled():
+        return
+
+    error = task.exception()
+    if error:
+        # fetch_pages has already closed its responses
+        logger.warning(f"Discarded page prefetch failed: {error!r}")
+        return
+
+    close_responses(response for response, _ in task.result())
+
+
+class FlaggedEvent(NamedTuple):
+    """A flagged event with its database row and queue message built up front."""
+
+    event_id: str
+    warning_type: str
+    row: Dict[str, Any]
+    message: bytes
+
+
+def build_flagged_event(event: Dict[str, Any], warning_type: str) -> FlaggedEvent:
+    """
+    Build the flagged_events row and warning queue message for a flagged event.
+
+    Args:
+        event: GitHub event object
+        warning_type: Warning returned by should_flag_event
+
+    Returns:
+        FlaggedEvent ready to be inserted and queued
+    """
+    event_id = event.get("id")
+    row = {
+        "event_payload": event,
+        "type": warning_type,
+        "id": event_id,
+        "actor_username": event.get("actor", {}).get("login", ""),
+        "repo_name": event.get("repo", {}).get("name", ""),
+        "org_name": event.get("org", {}).get("login", ""),
+    }
+    message = serialize_event_for_queue(event_id, event, warning_type)
+    return FlaggedEvent(event_id, warning_type, row, message)
+
+
+def build_events_logger() -> logging.Logger:
+    """
+    Build the logger writing the rotated events log, kept out of the app log.
+    """
+    handler = RotatingFileHandler(
+        EVENTS_LOG_PATH,
+        maxBytes=EVENTS_LOG_MAX_BYTES,
+        backupCount=EVENTS_LOG_BACKUPS,
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    events_logger = logging.getLogger(f"{__name__}.events")
+    events_logger.addHandler(handler)
+    events_logger.setLevel(logging.INFO)
+    events_logger.propagate = False
+    return events_logger
+
+
+events_logger = build_events_logger()
+_events_log_queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_LOG_QUEUE_SIZE)
+
+
+def log_event_line(line: bytes) -> None:
+    """
+    Queue a line for the events log without waiting on the disk.
+
+    Args:
+        line: Encoded line, without a trailing newline
+    """
+    try:
+        _events_log_queue.put_nowait(line)
+    except asyncio.QueueFull:
+        # the log is best effort, never hold up polling for it
+        pass
+
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}, backing off for {backoff_time}s")
-            time.sleep(backoff_time)
-            backoff_time *= 2
+def write_event_lines(lines: List[bytes]) -> None:
+    """
+    Write a batch of lines to the events log as a single record.
+
+    Args:
+        lines: Encoded lines, without trailing newlines
+    """
+    events_logger.info(b"\n".join(lines).decode())
 
 
-def process_events(
-    events: List[Dict], last_processed_id: str
-) -> Tuple[List[Dict], bool]:
+async def events_log_writer() -> None:
+    """
+    Background task writing queued events log lines in batches.
+    """
+    while True:
+        lines = [await _events_log_queue.get()]
+        while len(lines) < EVENTS_LOG_BATCH_SIZE and not _events_log_queue.empty():
+            lines.append(_events_log_queue.get_nowait())
+
+        try:
+            await asyncio.to_thread(write_event_lines, lines)
+        except Exception as e:
+            # drop this batch but keep writing, or the queue would fill for good
+            logger.error(f"Failed to write {len(lines)} events log lines: {e!r}")
+
+        # let a small batch grow for a while before the next write
+        if len(lines) < EVENTS_LOG_BATCH_SIZE:
+            await asyncio.sleep(EVENTS_LOG_FLUSH_INTERVAL)
+
+
+async def process_events(
+    events: AsyncIterator[Dict], last_processed_id: str, seen_ids: set
+) -> Tuple[List[FlaggedEvent], bool]:
     """
     Process GitHub events and check for flagged events.
 
     Args:
-        events: List of GitHub event objects
+        events: GitHub event objects, stopped early once last_processed_id is seen
         last_processed_id: ID of last processed event from previous run
+        seen_ids: IDs already processed this poll, updated in place so events
+            repeated across overlapping pages are skipped
 
     Returns:
         Tuple containing:
@@ -142,135 +551,377 @@ def process_events(
             - Boolean indicating if last_processed_id was found
     """
     logger.info(
-        f"Processing {len(events)} events, looking for last_processed_id: {last_processed_id}"
+        f"Processing events, looking for last_processed_id: {last_processed_id}"
     )
 
     flagged_events = []
     found_last_id = False
 
-    for event in events:
+    async for event in events:
         event_id = event.get("id")
 
         # Log event to file for debugging/monitoring
-        with open("events.txt", "a") as f:
-            f.write(f"{json.dumps(event)}\n")
+        log_event_line(orjson.dumps(event))
+
+        # Yield so the prefetch of the next pages can progress meanwhile
+        await asyncio.sleep(0)
 
         if event_id == last_processed_id:
             logger.info(f"Found last processed event ID: {event_id}")
             found_last_id = True
             break
 
+        if event_id in seen_ids:
+            continue
+        seen_ids.add(event_id)
+
+        # most events are of types nothing checks, so skip those up front
+        if event.get("type") not in _INTERESTING and not is_dummy_event(event_id):
+            continue
+
         should_flag, warning_type = should_flag_event(event)
         if should_flag:
             logger.info(f"Flagged event {event_id} as: {warning_type}")
-            flagged_events.append((event, warning_type))
+            flagged_events.append(build_flagged_event(event, warning_type))
+
+    if not found_last_id:
+        log_event_line(b"NEW PAGE")
 
     logger.info(f"Found {len(flagged_events)} flagged events")
     return flagged_events, found_last_id
 
 
-def poll_github_events(
-    api_url: str, headers: Dict[str, str], last_processed_id: str
-) -> Tuple[List[Dict], str]:
+def get_page_urls(response: aiohttp.ClientResponse) -> List[str]:
+    """
+    Build the URLs of every page after the current one from the Link header.
+
+    Args:
+        response: Response for the current page
+
+    Returns:
+        URLs of the following pages, in order
+    """
+    match = _LINK_LAST_RE.search(response.headers.get("Link", ""))
+    if not match:
+        return []
+
+    last_url = URL(match.group(1))
+
+    current_page = int(response.url.query.get("page", 1))
+    last_page = int(last_url.query.get("page", current_page))
+    return [
+        str(last_url.update_query(page=page))
+        for page in range(current_page + 1, last_page + 1)
+    ]
+
+
+# keeps prefetches left running after a poll ends from being garbage collected
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+
+async def fetch_pages(
+    session: aiohttp.ClientSession, urls: List[str]
+) -> List[Tuple[aiohttp.ClientResponse, AsyncIterator[Dict]]]:
+    """
+    Fetch several pages of events concurrently.
+
+    Args:
+        session: Shared HTTP session carrying the auth headers
+        urls: Page URLs to request
+
+    Returns:
+        Each page's open response and streamed events in order, cut off at the
+        first page that came back empty or unchanged
+    """
+    results = await asyncio.gather(
+        *[make_github_request(session, url) for url in urls],
+        return_exceptions=True,
+    )
+    responses = [
+        None if isinstance(result, BaseException) else result for result in results
+    ]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        close_responses(responses)
+        raise errors[0]
+
+    pages = []
+    try:
+        for i, response in enumerate(responses):
+            unchanged = not response or response.status == 304
+            events = None if unchanged else await iter_events(response)
+            if not events:
+                # there is nothing past an empty or unchanged page
+                close_responses(responses[i:])
+                break
+
+            pages.append((response, events))
+    except BaseException:
+        close_responses(responses)
+        raise
+
+    return pages
+
+
+async def poll_github_events(
+    session: aiohttp.ClientSession, api_url: str, last_processed_id: str
+) -> Tuple[List[FlaggedEvent], Optional[str], int, List[aiohttp.ClientResponse]]:
     """
     Poll GitHub Events API and collect flagged events.
 
     Args:
+        session: Shared HTTP session carrying the auth headers
         api_url: GitHub Events API URL
-        headers: Request headers including auth token
         last_processed_id: ID of last processed event from previous run
 
     Returns:
-        List of flagged events
+        Tuple containing:
+            - List of flagged events
+            - ID of the newest event, None if there were no new events
+            - Seconds to wait before the next poll
+            - Successful responses of the processed pages, whose validators are
+              stored once the cycle's events are
     """
     logger.info(f"Starting GitHub events poll, last_processed_id: {last_processed_id}")
     all_flagged_events = []
+    processed_responses = []
 
     # Make initial request
-    response = make_github_request(api_url, headers)
+    response = await make_github_request(session, api_url)
     if not response:
         logger.info("No response from GitHub API, ending poll")
-        return all_flagged_events
+        return all_flagged_events, None, 60, processed_responses
 
     # Extract poll interval from response headers
     poll_interval = int(response.headers.get("X-Poll-Interval", 60))
     logger.info(f"GitHub API poll interval: {poll_interval}s")
 
-    events = response.json()
+    if response.status == 304:
+        return all_flagged_events, None, poll_interval, processed_responses
+
+    try:
+        events = await iter_events(response)
+    except BaseException:
+        response.close()
+        raise
+
     if not events:
         logger.info("No events returned from GitHub API")
-        return all_flagged_events
+        response.close()
+        return all_flagged_events, None, poll_interval, processed_responses
 
     # Update last_processed_id to newest event
-    new_last_id = events[0].get("id")
+    newest_event = await anext(events)
+    events = prepend_event(newest_event, events)
+    new_last_id = newest_event.get("id")
     logger.info(f"New last_processed_id will be: {new_last_id}")
 
-    page_count = 1
-    while True:
-        logger.info(f"Processing page {page_count}")
-
-        # Process current page of events
-        flagged_events, found_last_id = process_events(events, last_processed_id)
-        all_flagged_events.extend(flagged_events)
+    # Speculatively request the following pages a window at a time; pages past
+    # the last processed id are fetched but closed unread
+    page_urls = get_page_urls(response)
+    pages = [(response, events)]
+    page_count = 0
+    seen_ids = set()
+    next_pages = None
+    try:
+        while True:
+            # Request the next window while the current one is being processed
+            next_pages = None
+            if page_urls:
+                window = page_urls[:PAGE_FETCH_CONCURRENCY]
+                page_urls = page_urls[PAGE_FETCH_CONCURRENCY:]
+                next_pages = asyncio.create_task(fetch_pages(session, window))
+                _prefetch_tasks.add(next_pages)
+                next_pages.add_done_callback(_prefetch_tasks.discard)
+
+            found_last_id = False
+            while pages:
+                response, events = pages[0]
+                page_count += 1
+                logger.info(f"Processing page {page_count}")
+
+                # Process current page of events
+                flagged_events, found_last_id = await process_events(
+                    events, last_processed_id, seen_ids
+                )
+                all_flagged_events.extend(flagged_events)
+                if response.status == 200:
+                    processed_responses.append(response)
 
-        if found_last_id:
-            logger.info("Found last processed ID, stopping pagination")
-            break
+                if found_last_id:
+                    # left in pages, so it's closed with the rest unread below
+                    break
 
-        with open("events.txt", "a") as f:
-            f.write(f"NEW PAGE\n")
+                pages.pop(0)
+                response.release()
 
-        # Get next page URL from Link header
-        next_url = response.links.get("next", {}).get("url", "")
-        if not next_url:
-            logger.info("No more pages available")
-            break
+            if found_last_id:
+                logger.info("Found last processed ID, stopping pagination")
+                break
 
-        # Request next page
-        response = make_github_request(next_url, headers)
-        if not response:
-            break
+            if not next_pages:
+                logger.info("No more pages available")
+                break
 
-        events = response.json()
-        if not events:
-            break
+            pages = await next_pages
+            next_pages = None
+            if len(pages) < len(window):
+                # a page came back empty, so there is nothing past this window
+                page_urls = []
+    finally:
+        close_responses(response for response, _ in pages)
+        if next_pages:
+            next_pages.add_done_callback(close_prefetched_pages)
 
-        page_count += 1
+    logger.info(f"Collected {len(all_flagged_events)} unique flagged events")
+    return all_flagged_events, new_last_id, poll_interval, processed_responses
 
-    # Remove duplicate events by tracking seen IDs
-    seen_ids = set()
-    unique_flagged_events = []
 
-    for event in all_flagged_events:
-        event_id = event[0].get("id")
-        if event_id not in seen_ids:
-            seen_ids.add(event_id)
-            unique_flagged_events.append(event)
+def seen_events_keys() -> Tuple[str, str]:
+    """
+    Get the keys of today's and yesterday's seen event filters.
 
-    logger.info(
-        f"After deduplication: {len(unique_flagged_events)} unique flagged events"
+    Returns:
+        Tuple of today's key and yesterday's key
+    """
+    today = datetime.now(timezone.utc).date()
+    yesterday = today - timedelta(days=1)
+    return (
+        f"{SEEN_EVENTS_KEY_PREFIX}{today.isoformat()}",
+        f"{SEEN_EVENTS_KEY_PREFIX}{yesterday.isoformat()}",
     )
-    return unique_flagged_events, new_last_id, poll_interval
+
+
+async def filter_seen_events(
+    redis, flagged_events: List[FlaggedEvent]
+) -> List[FlaggedEvent]:
+    """
+    Drop flagged events that an earlier poll cycle already queued.
+
+    Args:
+        redis: Redis client
+        flagged_events: Flagged events from poll_github_events
+
+    Returns:
+        The flagged events not in today's or yesterday's filter
+    """
+    global _bloom_available
+
+    ids = [event.event_id for event in flagged_events]
+    pipe = redis.pipeline(transaction=False)
+    for key in seen_events_keys():
+        if _bloom_available:
+            pipe.execute_command("BF.MEXISTS", key, *ids)
+        else:
+            pipe.smismember(key, ids)
+
+    try:
+        in_today, in_yesterday = await pipe.execute()
+    except ResponseError:
+        if not _bloom_available:
+            raise
+        logger.warning("RedisBloom not available, tracking seen events in sets")
+        _bloom_available = False
+        return await filter_seen_events(redis, flagged_events)
+
+    return [
+        event
+        for event, today, yesterday in zip(flagged_events, in_today, in_yesterday)
+        if not (today or yesterday)
+    ]
+
+
+def mark_events_seen(pipe, event_ids: List[str]) -> None:
+    """
+    Add event ids to today's seen event filter.
+
+    Args:
+        pipe: Redis pipeline the writes are queued on
+        event_ids: IDs of the events that were queued
+    """
+    key = seen_events_keys()[0]
+    if _bloom_available:
+        pipe.execute_command(
+            "BF.INSERT",
+            key,
+            "CAPACITY",
+            SEEN_EVENTS_CAPACITY,
+            "ERROR",
+            SEEN_EVENTS_ERROR_RATE,
+            "ITEMS",
+            *event_ids,
+        )
+    else:
+        pipe.sadd(key, *event_ids)
+    pipe.expire(key, SEEN_EVENTS_TTL)
 
 
 def serialize_event_for_queue(
     warning_id: int, event: Dict[str, Any], warning_type: str
-) -> str:
+) -> bytes:
     """
     Serialize an event for the warning queue.
     """
-    return json.dumps(
+    return orjson.dumps(
         {"warning_id": warning_id, "event_payload": event, "type": warning_type}
     )
 
 
-async def poll_and_process_events(api_url: str, headers: dict) -> int:
+async def store_flagged_events(
+    redis, supabase, flagged_events: List[FlaggedEvent]
+) -> None:
+    """
+    Insert flagged events into the database and queue them for analysis.
+
+    Args:
+        redis: Redis client
+        supabase: Supabase client
+        flagged_events: New flagged events from poll_github_events
+    """
+    logger.info(f"Processing {len(flagged_events)} flagged events in database")
+
+    # Store new events and create warnings
+    # Process events in batches of 1000; each batch's queue messages are sent in
+    # a single pipeline once its upsert has landed, so the worker's write-back
+    # never upserts a row that doesn't exist yet
+    batch_size = 1000
+    for i in range(0, len(flagged_events), batch_size):
+        batch = flagged_events[i : i + batch_size]
+        logger.info(f"Processing batch {i//batch_size + 1} with {len(batch)} events")
+
+        # Warning records were built while the events were processed
+        warning_data = [event.row for event in batch]
+        query = supabase.table("flagged_events").upsert(
+            warning_data,
+            on_conflict="id",
+            ignore_duplicates=True,
+            returning=ReturnMethod.minimal,
+        )
+
+        pipe = redis.pipeline(transaction=False)
+        for event in batch:
+            # trim with ~ so Redis only drops whole macro nodes
+            pipe.xadd(
+                WARNING_QUEUE,
+                {"message": event.message},
+                maxlen=10_000,
+                approximate=True,
+            )
+
+        await asyncio.to_thread(query.execute)
+        await pipe.execute()
+        logger.info(f"Stored and queued {len(batch)} events")
+
+    await invalidate_summary_cache(redis)
+
+
+async def poll_and_process_events(session: aiohttp.ClientSession, api_url: str) -> int:
     """
     Wrapper around poll_github_events that handles Redis state and processes flagged events.
 
     Args:
+        session: Shared HTTP session carrying the auth headers
         api_url: GitHub Events API URL
-        headers: Request headers including auth token
     """
     logger.info("Starting poll and process cycle")
 
@@ -279,70 +930,36 @@ async def poll_and_process_events(api_url: str, headers: dict) -> int:
     supabase = get_supabase()
 
     # Get last processed ID from Redis
-    last_id = await redis.get("last_processed_event_id")
-    last_id = int(last_id) if last_id else -1
+    # kept as a string, event ids are compared as the strings GitHub returns
+    last_id = await redis.get(LAST_EVENT_ID_KEY)
     logger.info(f"Retrieved last_processed_id from Redis: {last_id}")
 
     # Poll GitHub events
-    flagged_events, new_last_id, poll_interval = poll_github_events(
-        api_url, headers, last_id
+    flagged_events, new_last_id, poll_interval, responses = await poll_github_events(
+        session, api_url, last_id
     )
 
-    if not flagged_events:
-        logger.info("No flagged events to process")
-        return poll_interval
-
-    logger.info(f"Processing {len(flagged_events)} flagged events in database")
-
-    # Store new events and create warnings
-    # Process events in batches of 1000
-    batch_size = 1000
-    for i in range(0, len(flagged_events), batch_size):
-        batch = flagged_events[i : i + batch_size]
-        logger.info(f"Processing batch {i//batch_size + 1} with {len(batch)} events")
-
-        # Create batch of warning records
-        warning_data = []
-        for event in batch:
-            warning_data.append(
-                {
-                    "event_payload": event[0],
-                    "type": event[1],
-                    "id": event[0].get("id"),
-                    "actor_username": event[0].get("actor", {}).get("login", ""),
-                    "repo_name": event[0].get("repo", {}).get("name", ""),
-                    "org_name": event[0].get("org", {}).get("login", ""),
-                }
-            )
-
-        # Insert batch into database
-        result = (
-            supabase.table("flagged_events")
-            .upsert(warning_data, on_conflict="id", ignore_duplicates=True)
-            .execute()
-        )
+    if flagged_events:
+        flagged_events = await filter_seen_events(redis, flagged_events)
 
-        logger.info(
-            f"Inserted {len(result.data) if result.data else 0} records into database"
-        )
-
-        # Process results and publish to Redis
-        if result.data:
-            for event in flagged_events:
-                event_payload = event[0]
-                warning_id = event_payload.get("id")
-                message = serialize_event_for_queue(
-                    warning_id,
-                    event_payload,
-                    event[1],
-                )
-                await redis.xadd(WARNING_QUEUE, {"message": message}, maxlen=10_000)
+    if flagged_events:
+        await store_flagged_events(redis, supabase, flagged_events)
+    else:
+        logger.info("No flagged events to process")
 
-            logger.info(f"Added {len(flagged_events)} messages to Redis queue")
+    # Only mark events seen, move the last processed ID and keep the pages'
+    # validators once every batch is stored, so a failed cycle is retried in full
+    # rather than answered with a 304
+    pipe = redis.pipeline(transaction=False)
+    if flagged_events:
+        mark_events_seen(pipe, [event.event_id for event in flagged_events])
+    for response in responses:
+        queue_validators(pipe, response)
+    if new_last_id:
+        pipe.set(LAST_EVENT_ID_KEY, str(new_last_id))
+    await pipe.execute()
 
-    # Update last processed ID in Redis
     if new_last_id:
-        await redis.set("last_processed_event_id", str(new_last_id))
         logger.info(f"Updated last_processed_id in Redis to: {new_last_id}")
 
     logger.info(f"Poll cycle complete, next poll in {poll_interval}s")
@@ -355,19 +972,30 @@ async def run_poller():
     Run the GitHub event poller in a continuous loop.
     """
     logger.info("Starting GitHub event poller")
-    headers = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
-
-    while True:
-        try:
-            poll_interval = await poll_and_process_events(GITHUB_ENDPOINT, headers)
-        except Exception as e:
-            logger.error(f"Error during poll run: {e}")
-            logger.error(traceback.format_exc())
-            poll_interval = 60  # Default fallback interval
-
-        logger.info(f"Sleeping for {poll_interval} seconds before next poll")
-        await asyncio.sleep(poll_interval)
+    events_log_task = asyncio.create_task(events_log_writer())
+
+    # one keep-alive session for the poller's lifetime, so pages reuse connections;
+    # the current and prefetched page windows fit within the connection limit
+    connector = aiohttp.TCPConnector(limit=10, keepalive_timeout=60, ttl_dns_cache=300)
+    try:
+        async with aiohttp.ClientSession(
+            headers=HEADERS, connector=connector, timeout=REQUEST_TIMEOUT
+        ) as session:
+            while True:
+                try:
+                    poll_interval = await poll_and_process_events(
+                        session, GITHUB_ENDPOINT
+                    )
+                except Exception as e:
+                    logger.error(f"Error during poll run: {e}")
+                    logger.error(traceback.format_exc())
+                    poll_interval = 60  # Default fallback interval
+
+                logger.info(f"Sleeping for {poll_interval} seconds before next poll")
+                await asyncio.sleep(poll_interval)
+    finally:
+        events_log_task.cancel()
 
 
 if __name__ == "__main__":
-    asyncio.run(run_poller())
+    uvloop.run(run_poller())